@@ -24,8 +24,7 @@ a reference implementation for you to run locally.
 import os
 import argparse
 import threading
-import tempfile
-import uuid
+import time
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QMessageBox
@@ -34,15 +33,29 @@ from PyQt6.QtCore import Qt, pyqtSignal
 
 import numpy as np
 import sounddevice as sd
-from scipy.io.wavfile import write as wavwrite
 
 from fingerprint import FingerprintDB
 
+SAMPLE_RATE = 44100
+# Length of the most recent audio that is identified, in seconds
+LISTEN_SECONDS = 5
+# Extra time allowed, beyond LISTEN_SECONDS, for the buffer to fill before
+# identification gives up
+FILL_TIMEOUT_MARGIN = 2
+
 
 class MainWindow(QWidget):
     """
     Main window of the MiniShazam application.
 
+    The microphone is opened once, when the window is created, and kept
+    running: a ``sounddevice.InputStream`` callback continuously writes
+    into a ring buffer holding the last ``LISTEN_SECONDS`` of audio.
+    Identifying a song snapshots that buffer, so there is no per‑request
+    device open and no wait for a fresh recording.  If the microphone
+    cannot be opened, the error is shown and opening is retried on the
+    next identification.
+
     Two Qt signals are defined to safely communicate results from the
     background recording thread back to the GUI thread:
 
@@ -60,13 +73,25 @@ class MainWindow(QWidget):
         self.setWindowTitle("MiniShazam")
         self.db = FingerprintDB.load(db_path)
 
+        # Ring buffer of the most recent microphone samples.  ``_ring_pos`` is
+        # the next write position and ``_ring_filled`` how many samples are
+        # valid; both are guarded by ``_ring_lock`` since the stream callback
+        # runs on PortAudio's thread.
+        self._ring = np.zeros(LISTEN_SECONDS * SAMPLE_RATE, dtype=np.float32)
+        self._ring_pos = 0
+        self._ring_filled = 0
+        # Last non‑empty status reported by the stream callback, if any
+        self._stream_status = None
+        self._ring_lock = threading.Lock()
+        self._stream = None
+
         layout = QVBoxLayout()
-        self.label = QLabel("Press 'Start Recording' to identify a song")
+        self.label = QLabel("Press 'Identify Song' while a song is playing")
         # Use AlignmentFlag in PyQt6
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.label)
 
-        self.button = QPushButton("Start Recording")
+        self.button = QPushButton("Identify Song")
         self.button.clicked.connect(self.handle_record)
         layout.addWidget(self.button)
 
@@ -76,33 +101,85 @@ class MainWindow(QWidget):
         self.finished.connect(self.on_recognition_finished)
         self.error_signal.connect(self.on_error)
 
+        self._open_stream()
+
+    def _open_stream(self) -> bool:
+        """
+        Open and start the microphone stream.
+
+        Failures (e.g. no input device) are reported through
+        :meth:`on_error` instead of propagating.  Returns whether the
+        stream is running.
+        """
+        try:
+            stream = sd.InputStream(samplerate=SAMPLE_RATE, channels=1,
+                                    dtype='float32', callback=self._on_audio)
+            stream.start()
+        except Exception as e:
+            self.on_error(f"Could not open the microphone: {e}")
+            return False
+        self._stream = stream
+        return True
+
+    def _on_audio(self, indata, frames, time_info, status) -> None:
+        """
+        ``InputStream`` callback: append a block of samples to the ring buffer.
+
+        An input overflow means samples were dropped, so the buffered audio
+        is no longer contiguous and is discarded.
+        """
+        samples = indata[:, 0]
+        size = len(self._ring)
+        if len(samples) > size:
+            samples = samples[-size:]
+        n = len(samples)
+        with self._ring_lock:
+            if status:
+                self._stream_status = str(status)
+                if status.input_overflow:
+                    self._ring_filled = 0
+            end = self._ring_pos + n
+            if end <= size:
+                self._ring[self._ring_pos:end] = samples
+            else:
+                split = size - self._ring_pos
+                self._ring[self._ring_pos:] = samples[:split]
+                self._ring[:n - split] = samples[split:]
+            self._ring_pos = end % size
+            self._ring_filled = min(self._ring_filled + n, size)
+
+    def _snapshot(self) -> np.ndarray | None:
+        """
+        Return the buffered audio in chronological order, or None until
+        ``LISTEN_SECONDS`` of audio have been captured.
+        """
+        with self._ring_lock:
+            if self._ring_filled < len(self._ring):
+                return None
+            return np.concatenate((self._ring[self._ring_pos:], self._ring[:self._ring_pos]))
+
     def handle_record(self):
         # Disable button to prevent re‑entrancy
         self.button.setEnabled(False)
-        self.label.setText("Recording... please make some noise!")
-        duration = 5  # seconds
-        sample_rate = 44100
-        channels = 1
+        if self._stream is None and not self._open_stream():
+            return
+        self.label.setText("Listening...")
 
-        def record_and_identify():
+        def identify():
             try:
-                # Record audio.  Blocking call runs in background thread.
-                recording = sd.rec(int(duration * sample_rate), samplerate=sample_rate,
-                                   channels=channels, dtype='float32')
-                sd.wait()  # Wait until recording is finished
-                # Write to a temporary WAV file
-                tmpdir = tempfile.gettempdir()
-                tmpfile = os.path.join(tmpdir, f"recording_{uuid.uuid4().hex}.wav")
-                # Convert float32 [-1,1] to 16‑bit PCM
-                audio_int16 = np.int16(recording[:, 0] * 32767)
-                wavwrite(tmpfile, sample_rate, audio_int16)
-                # Recognise the recording
-                track_id, score = self.db.recognise(tmpfile)
-                # Remove temp file
-                try:
-                    os.remove(tmpfile)
-                except OSError:
-                    pass
+                # Right after start‑up the buffer may not be full yet
+                deadline = time.monotonic() + LISTEN_SECONDS + FILL_TIMEOUT_MARGIN
+                audio = self._snapshot()
+                while audio is None:
+                    if time.monotonic() > deadline:
+                        message = "No audio received from the microphone."
+                        if self._stream_status:
+                            message += f" Last stream status: {self._stream_status}."
+                        raise RuntimeError(message)
+                    time.sleep(0.1)
+                    audio = self._snapshot()
+                # Recognise the buffered audio directly, without a temp file
+                track_id, score = self.db.recognise((SAMPLE_RATE, audio))
                 # Emit result via signal.  Use emit() to notify the GUI thread.
                 self.finished.emit(track_id, score)
             except Exception as e:
@@ -110,7 +187,16 @@ class MainWindow(QWidget):
                 self.error_signal.emit(str(e))
 
         # Start background thread
-        threading.Thread(target=record_and_identify, daemon=True).start()
+        threading.Thread(target=identify, daemon=True).start()
+
+    def closeEvent(self, event) -> None:
+        """
+        Stop and release the microphone stream when the window closes.
+        """
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+        super().closeEvent(event)
 
     def on_recognition_finished(self, track_id: object, score: int) -> None:
         """
@@ -135,15 +221,15 @@ class MainWindow(QWidget):
         """
         QMessageBox.critical(self, "Error", message)
         self.button.setEnabled(True)
-        self.label.setText("Press 'Start Recording' to identify a song")
+        self.label.setText("Press 'Identify Song' while a song is playing")
 
 
 def main():
     parser = argparse.ArgumentParser(description="MiniShazam desktop app")
     parser.add_argument(
         "--db-path",
-        default=os.path.join(os.getcwd(), "music_db", "fingerprints.pkl"),
-        help="Path to fingerprint database (.pkl).",
+        default=os.path.join(os.getcwd(), "music_db", "fingerprints.arrow"),
+        help="Path to fingerprint database (.arrow).",
     )
     args = parser.parse_args()
 
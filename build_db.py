@@ -2,7 +2,7 @@
 build_db.py
 ===========
 
-This script builds a fingerprint database from a collection of WAV files
+This script builds a fingerprint database from a collection of audio files
 stored in the ``music_db`` directory.  It uses the ``FingerprintDB``
 class defined in ``fingerprint.py`` to compute constellation maps and
 hashes for each track.
@@ -10,7 +10,9 @@ hashes for each track.
 Run this script from the repository root (or adjust the paths
 accordingly).  It will scan ``music_db`` for all ``.wav`` files,
 fingerprint them, and save the resulting database to
-``music_db/fingerprints.pkl``.
+``music_db/fingerprints.arrow``.  Compressed files (``.mp3``, ``.m4a``,
+``.flac``, ``.ogg``) are decoded in memory with PyAV, so a dataset such as
+FMA can be indexed without converting it to WAV first.
 
 Example:
 
@@ -23,7 +25,16 @@ music files if you prefer.
 
 import argparse
 import os
-from fingerprint import FingerprintDB
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from fingerprint import (
+    FingerprintDB,
+    _AUDIO_EXTENSIONS,
+    _cuda_available,
+    _fingerprint_file,
+    _set_fft_threads,
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -33,41 +44,76 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--music-dir",
         default=os.path.join(os.getcwd(), "music_db"),
-        help="Directory to scan for .wav files (recursively).",
+        help="Directory to scan for audio files (recursively).",
     )
     parser.add_argument(
         "--output",
         default=None,
-        help="Output .pkl path. Defaults to <music-dir>/fingerprints.pkl.",
+        help="Output .arrow path. Defaults to <music-dir>/fingerprints.arrow.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not write the per-track <file>.fp.npz hash caches.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of fingerprinting processes. Defaults to the CPU count. "
+        "Ignored when a CUDA GPU is used, which fingerprints in one process.",
     )
     return parser.parse_args()
 
 
+def add_results(db: FingerprintDB, base_dir: str, audio_files: list, results) -> None:
+    """Index the fingerprints of ``audio_files``, given in the same order."""
+    for path, (hashes, anchor_times) in zip(audio_files, results):
+        rel_path = os.path.relpath(path, base_dir)
+        title = os.path.splitext(os.path.basename(path))[0]
+        metadata = {"title": title, "filename": rel_path}
+        print(f"Adding {rel_path} ...", flush=True)
+        db.add_fingerprints(hashes, anchor_times, metadata)
+
+
 def main():
     args = parse_args()
     base_dir = os.path.abspath(args.music_dir)
-    out_path = os.path.abspath(args.output) if args.output else os.path.join(base_dir, "fingerprints.pkl")
+    out_path = os.path.abspath(args.output) if args.output else os.path.join(base_dir, "fingerprints.arrow")
     if not os.path.isdir(base_dir):
         raise FileNotFoundError(f"Music directory not found: {base_dir}")
 
     db = FingerprintDB()
-    wav_files = []
+    audio_files = []
     for root, _, files in os.walk(base_dir):
         for fname in files:
-            if fname.lower().endswith(".wav"):
-                wav_files.append(os.path.join(root, fname))
-
-    if not wav_files:
-        raise RuntimeError(f"No .wav files found under: {base_dir}")
-
-    print(f"Found {len(wav_files)} WAV files in {base_dir}", flush=True)
-    for path in sorted(wav_files):
-        rel_path = os.path.relpath(path, base_dir)
-        title = os.path.splitext(os.path.basename(path))[0]
-        metadata = {"title": title, "filename": rel_path}
-        print(f"Adding {rel_path} ...", flush=True)
-        db.add_track(path, metadata)
-
+            if fname.lower().endswith(_AUDIO_EXTENSIONS):
+                audio_files.append(os.path.join(root, fname))
+
+    if not audio_files:
+        raise RuntimeError(f"No audio files found under: {base_dir}")
+
+    print(f"Found {len(audio_files)} audio files in {base_dir}", flush=True)
+    audio_files.sort()
+    use_gpu = _cuda_available()
+    fingerprint = partial(_fingerprint_file, use_cache=not args.no_cache, use_gpu=use_gpu)
+    if use_gpu:
+        # One process drives the GPU: pool workers would each create a CUDA
+        # context and hold a whole track's spectrogram on the device.
+        print("Fingerprinting on the GPU", flush=True)
+        add_results(db, base_dir, audio_files, map(fingerprint, audio_files))
+    else:
+        # Fingerprinting is independent per track, so it is fanned out to
+        # worker processes; only the cheap indexing step runs in this
+        # process.  The workers already use every core, so each runs FFTW
+        # single threaded.
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=_set_fft_threads, initargs=(1,)
+        ) as executor:
+            results = executor.map(fingerprint, audio_files, chunksize=4)
+            add_results(db, base_dir, audio_files, results)
+
+    db.freeze()
     print(f"Saving fingerprint database to {out_path}", flush=True)
     db.save(out_path)
 
@@ -10,14 +10,11 @@ from __future__ import annotations
 import argparse
 import os
 import random
-import tempfile
 from typing import List
 
 import numpy as np
-from scipy.io import wavfile
-from scipy.io.wavfile import write as wavwrite
 
-from fingerprint import FingerprintDB
+from fingerprint import FingerprintDB, _read_mono_f32
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,6 +48,11 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="Minimum score considered a valid match.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not write the per-track <file>.fp.npz hash caches.",
+    )
     return parser.parse_args()
 
 
@@ -63,31 +65,15 @@ def list_wav_files(music_dir: str) -> List[str]:
     return sorted(files)
 
 
-def to_mono_float32(audio: np.ndarray) -> np.ndarray:
-    if audio.ndim > 1:
-        audio = audio.mean(axis=1)
-    if audio.dtype == np.int16:
-        return audio.astype(np.float32) / 32768.0
-    if audio.dtype == np.int32:
-        return audio.astype(np.float32) / 2147483648.0
-    return audio.astype(np.float32)
-
-
-def make_query_clip(path: str, clip_seconds: float, rng: random.Random) -> str:
-    sr, audio = wavfile.read(path)
-    audio = to_mono_float32(audio)
+def make_query_clip(path: str, clip_seconds: float, rng: random.Random) -> tuple[int, np.ndarray]:
+    sr, audio = _read_mono_f32(path)
     clip_len = max(1, int(sr * clip_seconds))
     if len(audio) <= clip_len:
         clip = audio
     else:
         start = rng.randint(0, len(audio) - clip_len)
         clip = audio[start:start + clip_len]
-
-    clip_i16 = np.int16(np.clip(clip, -1.0, 1.0) * 32767)
-    fd, tmp_path = tempfile.mkstemp(prefix="query_", suffix=".wav")
-    os.close(fd)
-    wavwrite(tmp_path, sr, clip_i16)
-    return tmp_path
+    return sr, clip
 
 
 def main() -> None:
@@ -110,7 +96,11 @@ def main() -> None:
     expected_by_id = {}
     for wav_path in all_files:
         rel = os.path.relpath(wav_path, music_dir)
-        track_id = db.add_track(wav_path, {"title": os.path.splitext(os.path.basename(wav_path))[0], "filename": rel})
+        track_id = db.add_track(
+            wav_path,
+            {"title": os.path.splitext(os.path.basename(wav_path))[0], "filename": rel},
+            use_cache=not args.no_cache,
+        )
         expected_by_id[track_id] = wav_path
 
     print("Running recognition queries...", flush=True)
@@ -118,14 +108,8 @@ def main() -> None:
     correct = 0
     rejected = 0
     for track_id, wav_path in expected_by_id.items():
-        query_path = make_query_clip(wav_path, args.clip_seconds, rng)
-        try:
-            predicted_id, score = db.recognise(query_path)
-        finally:
-            try:
-                os.remove(query_path)
-            except OSError:
-                pass
+        query = make_query_clip(wav_path, args.clip_seconds, rng)
+        predicted_id, score = db.recognise(query)
 
         attempts += 1
         if predicted_id is None or score < args.min_score:
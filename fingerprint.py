@@ -22,25 +22,183 @@ Usage:
 
   db = FingerprintDB()
   db.add_track("/path/to/song.wav", metadata={...})
-  db.save("fingerprints.pkl")
+  db.save("fingerprints.arrow")
 
   # later, load the database and recognise a sample
-  db = FingerprintDB.load("fingerprints.pkl")
+  db = FingerprintDB.load("fingerprints.arrow")
   track_id, score = db.recognise("/path/to/sample.wav")
   print(db.metadata[track_id], score)
 
-This code is designed to be educational rather than maximally
-optimised.  It trades performance for clarity and readability.
+  # audio already in memory (e.g. from a microphone) can be passed directly
+  track_id, score = db.recognise((sample_rate, samples))
+
+The pipeline is written to stay readable, but the hot paths are
+vectorised with NumPy and use optional accelerators when they are
+installed: pyFFTW for the spectrogram, Numba for peak pairing and
+PyTorch with CUDA for fingerprinting tracks on the GPU.  Without them
+everything falls back to plain NumPy.
 """
 
 from __future__ import annotations
 
+import json
 import os
-import pickle
+import zipfile
+from functools import lru_cache
 import numpy as np
+import pyarrow as pa
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.io import wavfile
-from scipy.signal import stft
-from scipy.ndimage import maximum_filter, generate_binary_structure, binary_erosion
+
+try:  # optional: FFTW is faster than numpy.fft for many same‑sized transforms
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+
+try:  # optional: compiles the peak pairing loop to native code
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Bump whenever the peak picking or hash packing changes so that stale
+# ``.fp.npz`` sidecar caches are recomputed instead of silently reused.
+_CACHE_VERSION = 7
+
+
+@lru_cache(maxsize=4)
+def _hann_window(window_size: int) -> np.ndarray:
+    """
+    Return a periodic Hann window normalised to unit sum.
+
+    This is the window ``scipy.signal.stft`` applies by default, including
+    its ``1 / sum(window)`` spectrum scaling, so ``amp_min`` keeps the same
+    meaning in dB.  Windows are cached per size for the lifetime of the
+    process, so the returned array is read‑only.
+    """
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(window_size) / window_size)
+    window = (window / window.sum()).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+
+# Number of spectrogram frames held in memory at once while peak picking
+_BLOCK_FRAMES = 1024
+
+# Number of frames transformed per call of a cached FFTW plan
+_FFT_BATCH = 256
+# FFTW plans keyed by window size, reused across tracks
+_rfft_plans: dict[int, object] = {}
+# Threads used by each FFTW plan; see _set_fft_threads
+_fft_threads = os.cpu_count() or 1
+
+
+def _set_fft_threads(n_threads: int) -> None:
+    """
+    Set the number of threads FFTW plans use and drop the cached plans.
+
+    Defaults to the CPU count.  Worker processes that already run one per
+    core (e.g. the pool in ``build_db.py``) should set this to 1, otherwise
+    N workers each start N FFTW threads.
+    """
+    global _fft_threads
+    _fft_threads = n_threads
+    _rfft_plans.clear()
+
+
+def _rfft_frames(frames: np.ndarray) -> np.ndarray:
+    """
+    Compute the real FFT of every row of ``frames``.
+
+    When pyFFTW is installed, a float32 FFTW plan for ``_FFT_BATCH`` frames
+    is built once per window size and reused for every batch of every track;
+    the last batch is zero‑padded to the planned shape.  Otherwise this
+    falls back to ``np.fft.rfft``.
+    """
+    if pyfftw is None:
+        return np.fft.rfft(frames, axis=1)
+    n_frames, window_size = frames.shape
+    plan = _rfft_plans.get(window_size)
+    if plan is None:
+        plan = pyfftw.builders.rfft(
+            np.empty((_FFT_BATCH, window_size), dtype=np.float32),
+            axis=1,
+            threads=_fft_threads,
+            planner_effort="FFTW_ESTIMATE",
+        )
+        _rfft_plans[window_size] = plan
+    out = np.empty((n_frames, window_size // 2 + 1), dtype=np.complex64)
+    batch = np.zeros((_FFT_BATCH, window_size), dtype=np.float32)
+    for start in range(0, n_frames, _FFT_BATCH):
+        chunk = frames[start:start + _FFT_BATCH]
+        batch[:len(chunk)] = chunk
+        batch[len(chunk):] = 0
+        # The plan returns its internal output buffer, so copy the rows out
+        out[start:start + len(chunk)] = plan(batch)[:len(chunk)]
+    return out
+
+
+def _db_spectrogram(frames: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """
+    Compute the dB magnitude spectrogram of a block of frames.
+
+    Parameters
+    ----------
+    frames : np.ndarray of shape (T, window_size)
+        Unwindowed audio frames.
+    window : np.ndarray
+        Analysis window applied to every frame.
+
+    Returns
+    -------
+    mags_db : np.ndarray of shape (T, window_size // 2 + 1)
+        float32 magnitudes in dB, indexed (time, frequency).
+    """
+    # Window every frame and transform them with a single real FFT.
+    # numpy < 2 computes the FFT in double precision; cast back if so
+    mags_db = np.abs(_rfft_frames(frames * window)).astype(np.float32, copy=False)
+    # Convert to decibels in place.  The magnitudes are deliberately not
+    # quantised: along sustained tones neighbouring frames differ by far
+    # less than an int16 step, and collapsing them into ties either turns
+    # every frame of a held note into a peak or leaves it with none.
+    mags_db += 1e-10
+    np.log10(mags_db, out=mags_db)
+    mags_db *= 20
+    return mags_db
+
+
+def _peak_mask(mags_db: np.ndarray, amp_min: float) -> np.ndarray:
+    """
+    Mark the local maxima of a dB spectrogram.
+
+    A peak is a point above ``amp_min`` that is not smaller than any of its
+    eight neighbours.  This follows the description of selecting
+    spectrogram peaks as candidate features【799623276281538†L130-L145】.
+    Comparing the spectrogram against shifted views of itself does this in
+    one pass, without the extra traversals of a generic maximum filter.
+    Padding with -inf lets the edge bins (including DC) still qualify as
+    peaks.
+
+    Ties are allowed in the input: pure tones can give exactly equal
+    magnitudes in adjacent frames.  A point must be strictly greater than
+    the neighbours that precede it in (time, frequency) order and at least
+    as large as the rest, so a plateau of equal values yields one peak (at
+    its first point) instead of one per point.
+    """
+    padded = np.pad(mags_db, 1, mode="constant", constant_values=-np.inf)
+    n_rows, n_cols = mags_db.shape
+    # Apply a threshold to remove low‑energy points
+    peaks_mask = mags_db > amp_min
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            neighbour = padded[dr:dr + n_rows, dc:dc + n_cols]
+            if dr == 0 or (dr == 1 and dc == 0):
+                peaks_mask &= mags_db > neighbour
+            else:
+                peaks_mask &= mags_db >= neighbour
+    return peaks_mask
 
 
 def _compute_constellation_map(
@@ -75,29 +233,157 @@ def _compute_constellation_map(
         Array of time‑frequency peak coordinates.  Each row is
         (time_index, frequency_index).
     """
-    # Compute the magnitude spectrogram
-    _, _, Zxx = stft(audio, fs=sr, nperseg=window_size, noverlap=window_size - hop_length)
-    magnitude = np.abs(Zxx)
-    # Convert to decibels
-    mags_db = 20 * np.log10(magnitude + 1e-10)
-
-    # Use a neighbourhood structure to detect local maxima.  A peak is a point
-    # that is greater than all other points in its neighbourhood.  This
-    # approach follows the description of selecting spectrogram peaks as
-    # candidate features【799623276281538†L130-L145】.
-    struct = generate_binary_structure(2, 2)
-    neighbourhood = maximum_filter(mags_db, footprint=struct) == mags_db
-    # Apply a threshold to remove low‑energy points
-    threshold = mags_db > amp_min
-    local_max = neighbourhood & threshold
-    # Erode the peak mask to sharpen the peaks
-    eroded = binary_erosion(local_max, structure=struct)
-    peaks_mask = local_max ^ eroded
+    # Everything below stays float32: float64 would double the memory
+    # traffic of the FFT and dB stages for no useful precision
+    audio = np.asarray(audio, dtype=np.float32)
+    # Zero‑pad half a window on both sides so the first and last samples
+    # get full frames centred on them, and round the end up to a whole hop
+    # (the same framing ``scipy.signal.stft`` uses by default).  Edge frames
+    # matter for short query clips.
+    half = window_size // 2
+    padded_len = len(audio) + 2 * half
+    tail = (-(padded_len - window_size)) % hop_length
+    audio = np.pad(audio, (half, half + tail))
+    window = _hann_window(window_size)
+    # Frame the signal as a strided view (no copy)
+    frames = sliding_window_view(audio, window_size)[::hop_length]
+    n_frames = len(frames)
+
+    # Process the spectrogram in blocks of frames so the working set stays
+    # cache sized instead of materialising the whole track's spectrogram.
+    # Each block carries one frame of context on either side for the time
+    # neighbours of its first and last frames; only the interior frames
+    # report peaks, so the result matches processing the track in one go.
+    step = _BLOCK_FRAMES - 2
+    blocks: list[np.ndarray] = []
+    for start in range(0, n_frames, step):
+        stop = min(start + step, n_frames)
+        lo = max(start - 1, 0)
+        hi = min(stop + 1, n_frames)
+        mags_db = _db_spectrogram(frames[lo:hi], window)
+        time_idx, freq_idx = np.nonzero(_peak_mask(mags_db, amp_min)[start - lo:stop - lo])
+        blocks.append(np.stack((time_idx + start, freq_idx), axis=-1))
+    return np.concatenate(blocks)
+
+
+@lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """
+    Return whether PyTorch is installed and can see a CUDA device.
 
-    # Get peak indices
-    freq_idx, time_idx = np.where(peaks_mask)
-    peaks = np.stack((time_idx, freq_idx), axis=-1)
-    return peaks
+    PyTorch is imported lazily because importing it is slow and it is only
+    needed for GPU fingerprinting.  The answer is cached, so callers should
+    check once and pass the result on rather than probing per file in
+    worker processes.
+    """
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def _peak_mask_cu(mags_db, amp_min: float):
+    """
+    PyTorch version of :func:`_peak_mask` for a tensor on any device.
+
+    Uses the same -inf padding and tie breaking, so the peaks match the
+    CPU test on identical input.
+    """
+    import torch.nn.functional as F
+
+    padded = F.pad(mags_db, (1, 1, 1, 1), value=-float("inf"))
+    n_rows, n_cols = mags_db.shape
+    peaks_mask = mags_db > amp_min
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            neighbour = padded[dr:dr + n_rows, dc:dc + n_cols]
+            if dr == 0 or (dr == 1 and dc == 0):
+                peaks_mask &= mags_db > neighbour
+            else:
+                peaks_mask &= mags_db >= neighbour
+    return peaks_mask
+
+
+def _compute_constellation_map_cu(
+    audio: np.ndarray,
+    sr: int,
+    window_size: int = 4096,
+    hop_length: int = 512,
+    fan_value: int = 10,
+    amp_min: float = -50,
+    device: str = "cuda"
+) -> np.ndarray:
+    """
+    GPU version of :func:`_compute_constellation_map` using PyTorch.
+
+    The framing, FFT, dB conversion and peak picking all run on ``device``;
+    only the peak coordinates are copied back.  Frames are processed in
+    blocks of ``_BLOCK_FRAMES`` with one frame of context on either side,
+    as on the CPU, so device memory does not grow with the track length.
+    The 8‑neighbour peak test is :func:`_peak_mask_cu`.  Parameters and
+    return value are the same as for :func:`_compute_constellation_map`.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    x = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).to(device)
+    half = window_size // 2
+    tail = (-(len(audio) + 2 * half - window_size)) % hop_length
+    x = F.pad(x, (half, half + tail))
+    window = torch.tensor(_hann_window(window_size), device=device)
+    # Strided view of the frames; only one block is windowed at a time
+    frames = x.unfold(0, window_size, hop_length)
+    n_frames = len(frames)
+
+    step = _BLOCK_FRAMES - 2
+    blocks = []
+    for start in range(0, n_frames, step):
+        stop = min(start + step, n_frames)
+        lo = max(start - 1, 0)
+        hi = min(stop + 1, n_frames)
+        spectrum = torch.fft.rfft(frames[lo:hi] * window, dim=1)
+        mags_db = 20 * torch.log10(spectrum.abs() + 1e-10)
+        peaks_mask = _peak_mask_cu(mags_db, amp_min)[start - lo:stop - lo]
+        time_idx, freq_idx = torch.nonzero(peaks_mask, as_tuple=True)
+        blocks.append(torch.stack((time_idx + start, freq_idx), dim=-1))
+    return torch.cat(blocks).cpu().numpy()
+
+
+def _pair_peaks_loop(
+    times: np.ndarray,
+    freqs: np.ndarray,
+    fan_value: int,
+    min_time_delta: int,
+    max_time_delta: int
+) -> np.ndarray:
+    """
+    Pair time‑sorted peaks with an explicit loop, for compilation by Numba.
+
+    Produces the same hashes as the vectorised path of
+    :func:`_generate_hashes`, grouped by anchor instead of by fan‑out
+    distance.  The output is preallocated for the worst case of
+    ``fan_value`` pairs per anchor and trimmed at the end.
+    """
+    n = len(times)
+    out = np.empty((n * fan_value, 2), dtype=np.int64)
+    k = 0
+    for i in range(n):
+        for j in range(i + 1, min(i + fan_value + 1, n)):
+            dt = times[j] - times[i]
+            if dt < min_time_delta:
+                continue
+            if dt > max_time_delta:
+                break
+            out[k, 0] = (freqs[i] & 0xFFFF) << 32 | (freqs[j] & 0xFFFF) << 16 | (dt & 0xFFFF)
+            out[k, 1] = times[i]
+            k += 1
+    return out[:k]
+
+
+_pair_peaks_nb = njit(cache=True)(_pair_peaks_loop) if njit is not None else None
 
 
 def _generate_hashes(
@@ -105,7 +391,7 @@ def _generate_hashes(
     fan_value: int = 10,
     min_time_delta: int = 0,
     max_time_delta: int = 200
-) -> list[tuple[int, int]]:
+) -> np.ndarray:
     """
     Generate hash tokens from a constellation map.
 
@@ -114,6 +400,12 @@ def _generate_hashes(
     Each pair yields a hash composed of (f1, f2, dt), where f1 and f2 are
     frequency bin indices and dt is the difference in time bins【799623276281538†L193-L204】.
 
+    Rather than looping over anchors in Python, the pairing is vectorised:
+    for every fan‑out distance ``k`` the anchors ``peaks[:-k]`` are paired
+    with the targets ``peaks[k:]`` in a single array operation.  When Numba
+    is installed, a compiled loop (:func:`_pair_peaks_loop`) is used
+    instead; it makes a single pass over the peaks.
+
     Parameters
     ----------
     peaks : np.ndarray of shape (N, 2)
@@ -127,97 +419,378 @@ def _generate_hashes(
 
     Returns
     -------
-    hashes : list of tuples (hash_val, offset)
-        Each element contains a 32‑bit integer hash and the time index of
+    hashes : np.ndarray of shape (M, 2)
+        Each row contains a 64‑bit integer hash and the time index of
         the anchor peak.  The offset is used later to align matches.
     """
     # Sort peaks by time to ensure monotonic order for pairing
-    peaks = peaks[np.argsort(peaks[:, 0])]
-    hashes: list[tuple[int, int]] = []
-    # For each anchor point, pair with subsequent points within the target zone
-    for i in range(len(peaks)):
-        anchor_time, anchor_freq = peaks[i]
-        # Consider candidate points ahead in time
-        for j in range(1, fan_value + 1):
-            if i + j >= len(peaks):
-                break
-            target_time, target_freq = peaks[i + j]
-            dt = target_time - anchor_time
-            if dt < min_time_delta:
-                continue
-            if dt > max_time_delta:
-                break
-            # Combine the frequencies and time delta into a single integer.
-            # Use 10 bits for each frequency and 12 bits for dt (up to 4096).  This
-            # packing yields a 32‑bit hash that uniquely identifies the pair.
-            hash_val = (anchor_freq & 0x3FF) << 22 | (target_freq & 0x3FF) << 12 | (dt & 0xFFF)
-            hashes.append((hash_val, anchor_time))
-    return hashes
+    # (frequency breaks ties, so the result does not depend on input order)
+    peaks = peaks[np.lexsort((peaks[:, 1], peaks[:, 0]))].astype(np.int64)
+    times = peaks[:, 0]
+    freqs = peaks[:, 1]
+    if _pair_peaks_nb is not None:
+        return _pair_peaks_nb(
+            np.ascontiguousarray(times), np.ascontiguousarray(freqs),
+            fan_value, min_time_delta, max_time_delta,
+        )
+    out_h: list[np.ndarray] = []
+    out_t: list[np.ndarray] = []
+    # Pair every anchor with the peak k positions ahead of it in time
+    for k in range(1, min(fan_value, len(peaks) - 1) + 1):
+        dt = times[k:] - times[:-k]
+        mask = (dt >= min_time_delta) & (dt <= max_time_delta)
+        anchor_freq = freqs[:-k][mask]
+        target_freq = freqs[k:][mask]
+        # Combine the frequencies and time delta into a single integer.
+        # Use 16 bits for each frequency and 16 bits for dt, leaving the top
+        # 16 bits of a 64‑bit hash unused.  Unlike a 32‑bit packing this
+        # holds every bin of a 4096‑point FFT (2049 bins) without aliasing,
+        # so the hash uniquely identifies the pair.
+        hash_val = (anchor_freq & 0xFFFF) << 32 | (target_freq & 0xFFFF) << 16 | (dt[mask] & 0xFFFF)
+        out_h.append(hash_val)
+        out_t.append(times[:-k][mask])
+    if not out_h:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.stack((np.concatenate(out_h), np.concatenate(out_t)), axis=1)
+
+
+def _cache_key(filepath: str, use_gpu: bool = False) -> np.ndarray:
+    """
+    Return the key identifying the current contents of ``filepath``.
+
+    The key combines the file's modification time and size with
+    ``_CACHE_VERSION`` and the backend that computed the hashes; any change
+    to one of them invalidates the cache.  GPU and CPU spectrograms round
+    differently, so their hashes are not interchangeable.
+    """
+    return np.array(
+        [os.path.getmtime(filepath), os.path.getsize(filepath), _CACHE_VERSION, use_gpu],
+        dtype=np.float64,
+    )
+
+
+def _load_cached_hashes(filepath: str, use_gpu: bool = False) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Load hashes for ``filepath`` from its ``.fp.npz`` sidecar.
+
+    Returns ``None`` if there is no sidecar, it cannot be read, or it was
+    written for a different version of the file or a different backend.
+    """
+    cache_path = filepath + ".fp.npz"
+    if not os.path.isfile(cache_path):
+        return None
+    try:
+        with np.load(cache_path) as data:
+            if not np.array_equal(data["key"], _cache_key(filepath, use_gpu)):
+                return None
+            return data["hashes"], data["anchor_times"]
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def _save_cached_hashes(
+    filepath: str, hashes: np.ndarray, anchor_times: np.ndarray, use_gpu: bool = False
+) -> None:
+    """
+    Write hashes for ``filepath`` to its ``.fp.npz`` sidecar.
+
+    Failing to write the cache (e.g. a read‑only music directory) is not
+    an error; the hashes are simply recomputed next time.
+    """
+    try:
+        np.savez_compressed(
+            filepath + ".fp.npz",
+            key=_cache_key(filepath, use_gpu),
+            hashes=hashes,
+            anchor_times=anchor_times,
+        )
+    except OSError:
+        pass
+
+
+# Factor that maps each supported WAV sample type onto [-1, 1)
+_SCALE = {
+    np.dtype(np.int16): 1.0 / 32768,
+    np.dtype(np.int32): 1.0 / 2147483648,
+    np.dtype(np.float32): 1.0,
+    np.dtype(np.float64): 1.0,
+}
+
+
+def _read_mono_f32(filepath: str) -> tuple[int, np.ndarray]:
+    """
+    Read a WAV file as mono float32 samples in [-1, 1).
+
+    The file is memory‑mapped, so the float cast is the only copy of the
+    samples.  Integer samples are scaled by ``_SCALE`` before multichannel
+    audio is averaged down to mono.
+
+    Returns
+    -------
+    sr : int
+        Sample rate of the file.
+    audio : np.ndarray
+        1‑D float32 array of samples.
+    """
+    try:
+        sr, audio = wavfile.read(filepath, mmap=True)
+    except ValueError:
+        # 24‑bit and some other encodings cannot be memory‑mapped
+        sr, audio = wavfile.read(filepath)
+    scale = _SCALE.get(audio.dtype, 1.0)
+    audio = audio.astype(np.float32)
+    if scale != 1.0:
+        audio *= scale
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    return sr, audio
+
+
+# Compressed formats decoded in process with PyAV instead of via WAV files
+_DECODED_EXTENSIONS = (".mp3", ".m4a", ".flac", ".ogg")
+# Every file extension that can be fingerprinted
+_AUDIO_EXTENSIONS = (".wav",) + _DECODED_EXTENSIONS
+# Compressed audio is resampled to the rate used for WAVs and recordings
+_DECODE_RATE = 44100
+
+
+def _decode_mono_f32(filepath: str) -> tuple[int, np.ndarray]:
+    """
+    Decode a compressed audio file straight to mono float32 samples.
+
+    PyAV (libavcodec) decodes and resamples to ``_DECODE_RATE`` in memory,
+    which avoids converting the file to an intermediate WAV on disk.
+
+    Returns
+    -------
+    sr : int
+        Sample rate of the decoded audio (``_DECODE_RATE``).
+    audio : np.ndarray
+        1‑D float32 array of samples.
+    """
+    try:
+        import av
+    except ImportError:
+        raise RuntimeError(
+            "PyAV is required to decode compressed audio but is not installed. "
+            "Install it with `pip install av` and retry."
+        ) from None
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=_DECODE_RATE)
+    chunks: list[np.ndarray] = []
+    with av.open(filepath) as container:
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray()[0])
+        # Flush samples buffered inside the resampler
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray()[0])
+    audio = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+    return _DECODE_RATE, audio
+
+
+def _read_audio(filepath: str) -> tuple[int, np.ndarray]:
+    """
+    Read any supported audio file as mono float32 samples.
+
+    WAV files go through :func:`_read_mono_f32`; compressed formats are
+    decoded with :func:`_decode_mono_f32`.
+    """
+    if filepath.lower().endswith(_DECODED_EXTENSIONS):
+        return _decode_mono_f32(filepath)
+    return _read_mono_f32(filepath)
+
+
+def _fingerprint_file(
+    filepath: str, use_cache: bool = True, use_gpu: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fingerprint an audio file.
+
+    This is a pure function of the file contents so that it can be run in
+    worker processes; indexing the result is left to
+    :meth:`FingerprintDB.add_fingerprints`.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the audio file (WAV, or a format listed in
+        ``_DECODED_EXTENSIONS``) to fingerprint.
+    use_cache : bool
+        If true, reuse the hashes stored in ``<filepath>.fp.npz`` when the
+        file is unchanged, and write that sidecar after fingerprinting.
+    use_gpu : bool
+        If true, compute the constellation map on the GPU with
+        :func:`_compute_constellation_map_cu`.  Decide this once with
+        :func:`_cuda_available`.  Queries always run on the CPU and the
+        two backends round differently, so only bulk builds should use it.
+
+    Returns
+    -------
+    hashes : np.ndarray
+        Hash tokens of the track.
+    anchor_times : np.ndarray
+        Time index of the anchor peak of each hash.
+    """
+    if use_cache:
+        cached = _load_cached_hashes(filepath, use_gpu)
+        if cached is not None:
+            return cached
+    sr, audio = _read_audio(filepath)
+    # Compute constellation map
+    if use_gpu:
+        peaks = _compute_constellation_map_cu(audio, sr)
+    else:
+        peaks = _compute_constellation_map(audio, sr)
+    # Generate hashes
+    hashes = _generate_hashes(peaks)
+    hashes, anchor_times = hashes[:, 0], hashes[:, 1]
+    if use_cache:
+        _save_cached_hashes(filepath, hashes, anchor_times, use_gpu)
+    return hashes, anchor_times
+
+
+def _vote(track_ids: np.ndarray, deltas: np.ndarray) -> tuple[int | None, int]:
+    """
+    Find the track with the largest cluster of consistent offset differences.
+
+    Each (track_id, delta) pair is one vote.  Packing the pair into a single
+    64‑bit key lets ``np.unique`` build the per‑track offset histograms in
+    one call; the score of a track is the size of its largest bin
+    【799623276281538†L280-L338】.
+
+    Returns
+    -------
+    track_id : int or None
+        The best matching track, or None if there were no votes.
+    score : int
+        The number of votes in that track's largest offset bin.
+    """
+    if len(track_ids) == 0:
+        return None, 0
+    keys = (track_ids.astype(np.int64) << 32) | (deltas.astype(np.int64) & 0xFFFFFFFF)
+    keys, counts = np.unique(keys, return_counts=True)
+    best = np.argmax(counts)
+    return int(keys[best] >> 32), int(counts[best])
+
+
+def _json_default(obj):
+    """
+    Convert numpy values that ``json`` cannot serialise to Python types.
+
+    Passed as ``default=`` to ``json.dumps`` when saving track metadata.
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class FingerprintDB:
     """
     Simple in‑memory fingerprint database.
 
-    The database holds a mapping from hash tokens to lists of (track_id, offset)
-    pairs and a metadata dictionary containing user‑provided metadata for each
-    track.  When adding a track, its constellation map and hashes are computed
-    and inserted into the index.  During recognition, the index is queried
-    against an unknown sample to accumulate offset votes per track as described
-    in the Shazam paper【799623276281538†L280-L338】.
+    The index is stored as three flat arrays sorted by hash value:
+    ``hash_sorted``, ``track_ids`` and ``offsets``.  Row ``i`` says that
+    hash ``hash_sorted[i]`` occurs in track ``track_ids[i]`` at anchor time
+    ``offsets[i]``, so all postings of a hash form one contiguous run that
+    is found with ``np.searchsorted``.  A metadata dictionary holds the
+    user‑provided metadata for each track.
+
+    When adding a track, its constellation map and hashes are computed and
+    queued; :meth:`freeze` merges queued tracks into the sorted arrays.
+    During recognition, the index is queried against an unknown sample to
+    accumulate offset votes per track as described in the Shazam paper
+    【799623276281538†L280-L338】.
     """
 
     def __init__(self):
-        self.hash_table: dict[int, list[tuple[int, int]]] = {}
+        self.hash_sorted = np.empty(0, dtype=np.int64)
+        self.track_ids = np.empty(0, dtype=np.int32)
+        self.offsets = np.empty(0, dtype=np.int32)
         self.metadata: dict[int, dict] = {}
         self._next_track_id = 0
+        # (track_id, hashes, anchor_times) of tracks not yet merged into the index
+        self._pending: list[tuple[int, np.ndarray, np.ndarray]] = []
 
-    def add_track(self, filepath: str, metadata: dict | None = None) -> int:
+    def add_track(self, filepath: str, metadata: dict | None = None, use_cache: bool = True) -> int:
         """
         Add an audio track to the fingerprint database.
 
         Parameters
         ----------
         filepath : str
-            Path to the audio file (WAV format) to add.
+            Path to the audio file (WAV, or a format listed in
+            ``_DECODED_EXTENSIONS``) to add.
         metadata : dict, optional
-            Arbitrary metadata about the track (e.g. title, artist, album).  If
-            omitted, a default metadata dict containing the filename will be
-            stored.
+            Metadata about the track (e.g. title, artist, album).  It must be
+            JSON‑serialisable for :meth:`save`; numpy scalars and arrays are
+            converted, and tuples are loaded back as lists.  If omitted, a
+            default metadata dict containing the filename will be stored.
+        use_cache : bool
+            If true, reuse the hashes stored in ``<filepath>.fp.npz`` when the
+            file is unchanged, and write that sidecar after fingerprinting.
 
         Returns
         -------
         track_id : int
             Internal identifier assigned to the new track.
         """
-        track_id = self._next_track_id
-        self._next_track_id += 1
-        # Read audio file
-        sr, audio = wavfile.read(filepath)
-        # Convert stereo to mono if necessary
-        if audio.ndim > 1:
-            audio = audio.mean(axis=1)
-        # Normalise audio to floating point
-        if audio.dtype == np.int16:
-            audio = audio.astype(np.float32) / 32768.0
-        elif audio.dtype == np.int32:
-            audio = audio.astype(np.float32) / 2147483648.0
-        else:
-            audio = audio.astype(np.float32)
-        # Compute constellation map
-        peaks = _compute_constellation_map(audio, sr)
-        # Generate hashes
-        hashes = _generate_hashes(peaks)
-        # Insert into hash table
-        for h, offset in hashes:
-            self.hash_table.setdefault(h, []).append((track_id, offset))
-        # Store metadata
+        hashes, anchor_times = _fingerprint_file(filepath, use_cache)
         if metadata is None:
             metadata = {"title": os.path.basename(filepath)}
+        return self.add_fingerprints(hashes, anchor_times, metadata)
+
+    def add_fingerprints(self, hashes: np.ndarray, anchor_times: np.ndarray, metadata: dict) -> int:
+        """
+        Add an already fingerprinted track to the database.
+
+        This is the indexing half of :meth:`add_track`, for callers that
+        compute fingerprints elsewhere (e.g. in a process pool).
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            Hash tokens of the track, as returned by ``_fingerprint_file``.
+        anchor_times : np.ndarray
+            Time index of the anchor peak of each hash.
+        metadata : dict
+            Metadata about the track, JSON‑serialisable as for
+            :meth:`add_track`.
+
+        Returns
+        -------
+        track_id : int
+            Internal identifier assigned to the new track.
+        """
+        track_id = self._next_track_id
+        self._next_track_id += 1
+        self._pending.append((track_id, hashes, anchor_times))
         self.metadata[track_id] = metadata
         return track_id
 
-    def recognise(self, filepath: str) -> tuple[int | None, int]:
+    def freeze(self) -> None:
+        """
+        Merge all queued tracks into the sorted index arrays.
+
+        This is called automatically before recognising or saving.  Freezing
+        without queued tracks is a no‑op.
+        """
+        if not self._pending:
+            return
+        hashes = [self.hash_sorted] + [h for _, h, _ in self._pending]
+        track_ids = [self.track_ids] + [np.full(len(h), tid, dtype=np.int32) for tid, h, _ in self._pending]
+        offsets = [self.offsets] + [t for _, _, t in self._pending]
+        hashes = np.concatenate(hashes).astype(self.hash_sorted.dtype)
+        # A stable sort keeps postings of each hash in insertion order
+        order = np.argsort(hashes, kind="stable")
+        self.hash_sorted = hashes[order]
+        self.track_ids = np.concatenate(track_ids)[order]
+        self.offsets = np.concatenate(offsets).astype(np.int32)[order]
+        self._pending = []
+
+    def recognise(self, source: str | tuple[int, np.ndarray]) -> tuple[int | None, int]:
         """
         Recognise an unknown audio sample.
 
@@ -228,8 +801,11 @@ class FingerprintDB:
 
         Parameters
         ----------
-        filepath : str
-            Path to the audio file (WAV format) to identify.
+        source : str or tuple of (int, np.ndarray)
+            Either the path to an audio file (WAV, or a format listed in
+            ``_DECODED_EXTENSIONS``) to identify, or an in‑memory
+            ``(sample_rate, audio)`` pair where ``audio`` is a 1‑D array of
+            mono samples in [-1, 1).
 
         Returns
         -------
@@ -238,59 +814,63 @@ class FingerprintDB:
         best_score : int
             The highest number of aligned matching hashes for the identified track.
         """
-        # Read audio file
-        sr, audio = wavfile.read(filepath)
-        if audio.ndim > 1:
-            audio = audio.mean(axis=1)
-        if audio.dtype == np.int16:
-            audio = audio.astype(np.float32) / 32768.0
-        elif audio.dtype == np.int32:
-            audio = audio.astype(np.float32) / 2147483648.0
+        if isinstance(source, tuple):
+            sr, audio = source
         else:
-            audio = audio.astype(np.float32)
+            sr, audio = _read_audio(source)
         peaks = _compute_constellation_map(audio, sr)
         hashes = _generate_hashes(peaks)
-        # Accumulate offset votes per track
-        votes: dict[int, dict[int, int]] = {}
-        for h, offset in hashes:
-            matches = self.hash_table.get(h)
-            if not matches:
-                continue
-            for track_id, db_offset in matches:
-                dt = db_offset - offset
-                votes.setdefault(track_id, {}).setdefault(dt, 0)
-                votes[track_id][dt] += 1
-        # Find the best matching track
-        best_track = None
-        best_score = 0
-        for track_id, offsets in votes.items():
-            # Score is the largest cluster size (number of matching hashes) in the histogram
-            score = max(offsets.values())
-            if score > best_score:
-                best_score = score
-                best_track = track_id
-        return best_track, best_score
+        self.freeze()
+        # Find the run of postings for every query hash at once
+        query = hashes[:, 0].astype(self.hash_sorted.dtype)
+        starts = np.searchsorted(self.hash_sorted, query, side="left")
+        counts = np.searchsorted(self.hash_sorted, query, side="right") - starts
+        # Expand the runs into one flat index of matching postings:
+        # run i contributes starts[i], starts[i] + 1, ..., starts[i] + counts[i] - 1
+        run_begin = np.cumsum(counts) - counts
+        idx = np.repeat(starts - run_begin, counts) + np.arange(counts.sum())
+        deltas = self.offsets[idx] - np.repeat(hashes[:, 1], counts)
+        return _vote(self.track_ids[idx], deltas)
 
     def save(self, filename: str) -> None:
         """
-        Save the fingerprint database to disk using pickle.
+        Save the fingerprint database to disk as an Arrow IPC file.
+
+        The index arrays become the ``hash``, ``tid`` and ``off`` columns of
+        a single record batch.  The metadata dictionary and the next track
+        id are stored as JSON in the schema metadata, so the database stays
+        a single file.  Metadata values must therefore be JSON‑serialisable;
+        numpy scalars and arrays are converted to Python numbers and lists.
         """
-        with open(filename, "wb") as f:
-            pickle.dump({
-                'hash_table': self.hash_table,
-                'metadata': self.metadata,
-                '_next_track_id': self._next_track_id,
-            }, f)
+        self.freeze()
+        batch = pa.record_batch(
+            {"hash": self.hash_sorted, "tid": self.track_ids, "off": self.offsets},
+        )
+        schema = batch.schema.with_metadata({
+            "metadata": json.dumps(self.metadata, default=_json_default),
+            "next_track_id": str(self._next_track_id),
+        })
+        with pa.OSFile(filename, "wb") as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                writer.write_batch(batch)
 
     @classmethod
     def load(cls, filename: str) -> FingerprintDB:
         """
         Load a fingerprint database from disk.
+
+        The file is memory‑mapped and the index arrays are zero‑copy views
+        of it, so loading takes constant time regardless of database size;
+        pages are read in as lookups touch them.
         """
-        with open(filename, "rb") as f:
-            data = pickle.load(f)
         obj = cls()
-        obj.hash_table = data['hash_table']
-        obj.metadata = data['metadata']
-        obj._next_track_id = data['_next_track_id']
-        return obj
\ No newline at end of file
+        reader = pa.ipc.open_file(pa.memory_map(filename, "r"))
+        batch = reader.get_batch(0)
+        obj.hash_sorted = batch.column("hash").to_numpy(zero_copy_only=True)
+        obj.track_ids = batch.column("tid").to_numpy(zero_copy_only=True)
+        obj.offsets = batch.column("off").to_numpy(zero_copy_only=True)
+        meta = reader.schema.metadata
+        # JSON object keys are strings; track ids are ints
+        obj.metadata = {int(k): v for k, v in json.loads(meta[b"metadata"]).items()}
+        obj._next_track_id = int(meta[b"next_track_id"])
+        return obj
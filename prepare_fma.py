@@ -11,6 +11,7 @@ import argparse
 import os
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 
 
@@ -37,6 +38,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip conversion if destination WAV already exists.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of ffmpeg processes to run in parallel (default: CPU count).",
+    )
     return parser.parse_args()
 
 
@@ -64,6 +71,8 @@ def convert_one(src: str, dst: str) -> None:
         "-hide_banner",
         "-loglevel",
         "error",
+        "-threads",
+        "1",
         "-i",
         src,
         "-ac",
@@ -98,23 +107,34 @@ def main() -> None:
     skipped = 0
     failed = 0
 
-    for i, src in enumerate(mp3_files, start=1):
+    jobs = []
+    for src in mp3_files:
         rel = os.path.relpath(src, input_dir)
         dst_rel = os.path.splitext(rel)[0] + ".wav"
         dst = os.path.join(output_dir, dst_rel)
 
         if args.skip_existing and os.path.exists(dst):
             skipped += 1
-            print(f"[{i}/{len(mp3_files)}] skip {dst_rel}", flush=True)
+            print(f"[{skipped}/{len(mp3_files)}] skip {dst_rel}", flush=True)
             continue
-
-        try:
-            convert_one(src, dst)
-            converted += 1
-            print(f"[{i}/{len(mp3_files)}] ok   {dst_rel}", flush=True)
-        except subprocess.CalledProcessError:
-            failed += 1
-            print(f"[{i}/{len(mp3_files)}] fail {rel}", flush=True)
+        jobs.append((src, dst, rel, dst_rel))
+
+    # ffmpeg runs as a separate process, so threads are enough to keep all
+    # cores busy; each ffmpeg is limited to one thread to avoid oversubscription.
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(convert_one, src, dst): (rel, dst_rel)
+            for src, dst, rel, dst_rel in jobs
+        }
+        for i, future in enumerate(as_completed(futures), start=skipped + 1):
+            rel, dst_rel = futures[future]
+            try:
+                future.result()
+                converted += 1
+                print(f"[{i}/{len(mp3_files)}] ok   {dst_rel}", flush=True)
+            except subprocess.CalledProcessError:
+                failed += 1
+                print(f"[{i}/{len(mp3_files)}] fail {rel}", flush=True)
 
     print("Done.")
     print(f"Converted: {converted}")